@@ -0,0 +1,67 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True
+
+# MIT License
+#
+# Copyright (c) 2018 Chenrui Lei
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import numpy as np
+
+
+def check_collisions(double[:, ::1] robot_xy, double[::1] robot_r,
+                     double[:, ::1] walls_packed):
+    """Check every robot against every wall box.
+
+    Args:
+        robot_xy (:obj:`numpy.ndarray`): (R, 2) robot positions.
+        robot_r (:obj:`numpy.ndarray`): (R,) robot collision radii.
+        walls_packed (:obj:`numpy.ndarray`): (W, 6) wall boxes, one
+            (cx, cy, cos, sin, half length, half thickness) row per wall.
+
+    Returns:
+        :obj:`numpy.ndarray`: (R,) uint8 mask, 1 where a robot touches a wall.
+
+    """
+    cdef Py_ssize_t n_robots = robot_xy.shape[0]
+    cdef Py_ssize_t n_walls = walls_packed.shape[0]
+    cdef Py_ssize_t i, j
+    cdef double px, py, r_sq, dx, dy, lx, ly, ex, ey, hl, ht
+
+    hit = np.zeros(n_robots, dtype=np.uint8)
+    cdef unsigned char[::1] hit_view = hit
+
+    for i in range(n_robots):
+        px = robot_xy[i, 0]
+        py = robot_xy[i, 1]
+        r_sq = robot_r[i] * robot_r[i]
+        for j in range(n_walls):
+            dx = px - walls_packed[j, 0]
+            dy = py - walls_packed[j, 1]
+            lx = walls_packed[j, 2]*dx + walls_packed[j, 3]*dy
+            ly = -walls_packed[j, 3]*dx + walls_packed[j, 2]*dy
+            hl = walls_packed[j, 4]
+            ht = walls_packed[j, 5]
+            ex = lx - (hl if lx > hl else (-hl if lx < -hl else lx))
+            ey = ly - (ht if ly > ht else (-ht if ly < -ht else ly))
+            if ex*ex + ey*ey < r_sq:
+                hit_view[i] = 1
+                break
+
+    return hit
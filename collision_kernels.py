@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# MIT License
+#
+# Copyright (c) 2018 Chenrui Lei
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import functools
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional, the kernels run as plain Python without it
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:
+    from collision_ext import check_collisions
+except ImportError:
+    # The Cython kernel is built explicitly with setup.py build_ext, without
+    # it Game uses its NumPy sweep instead
+    check_collisions = None
+
+
+def segments_intersect(ax, ay, bx, by, cx, cy, dx, dy):
+    """Check whether segment AB touches or crosses segment CD.
+
+    Left as plain Python: it is called once per wall edge from the bullet
+    pass, where Numba dispatch saves little and compiling stalls a tick.
+
+    """
+    d1 = (dx - cx)*(ay - cy) - (dy - cy)*(ax - cx)
+    d2 = (dx - cx)*(by - cy) - (dy - cy)*(bx - cx)
+    d3 = (bx - ax)*(cy - ay) - (by - ay)*(cx - ax)
+    d4 = (bx - ax)*(dy - ay) - (by - ay)*(dx - ax)
+    if d1 == 0.0 and d2 == 0.0:
+        # Collinear, the segments meet only if their extents overlap
+        return min(ax, bx) <= max(cx, dx) and min(cx, dx) <= max(ax, bx) \
+            and min(ay, by) <= max(cy, dy) and min(cy, dy) <= max(ay, by)
+    return d1*d2 <= 0.0 and d3*d4 <= 0.0
+
+
+@njit(cache=True, fastmath=True)
+def point_obb_distance_sq(px, py, cx, cy, cos_t, sin_t, half_len, half_thick):
+    """Squared distance from a point to an oriented box, 0 if inside it.
+
+    The point is moved into the box frame and clamped to the box extents,
+    which covers the corner, edge and inside cases in a single pass.
+
+    Args:
+        px (:obj:`float`): Point x position.
+        py (:obj:`float`): Point y position.
+        cx (:obj:`float`): Box center x position.
+        cy (:obj:`float`): Box center y position.
+        cos_t (:obj:`float`): Cosine of the box orientation.
+        sin_t (:obj:`float`): Sine of the box orientation.
+        half_len (:obj:`float`): Half of the box extent along its x axis.
+        half_thick (:obj:`float`): Half of the box extent along its y axis.
+
+    """
+    dx = px - cx
+    dy = py - cy
+    lx = cos_t*dx + sin_t*dy
+    ly = -sin_t*dx + cos_t*dy
+    ex = lx - min(max(lx, -half_len), half_len)
+    ey = ly - min(max(ly, -half_thick), half_thick)
+    return ex*ex + ey*ey
+
+
+@functools.lru_cache(maxsize=8)
+def build_wall_collision_fn(walls):
+    """Generate a circle-vs-walls collision test for a fixed set of walls.
+
+    Every wall is written into the function source with its parameters as
+    literals, so the generated test is straight-line code with no loop over
+    walls and no attribute lookups: a bounding-circle reject followed by
+    point_obb_distance_sq. Results are cached per wall layout, so rebuilding
+    a game on the same map does not compile it again.
+
+    Args:
+        walls (:obj:`tuple`): One (cx, cy, cos, sin, half length,
+            half thickness, bound radius) tuple per wall.
+
+    Returns:
+        A function ``check(px, py, r)`` returning True if a circle at
+        (px, py) with radius r touches any of the walls.
+
+    """
+    lines = [
+        "def check(px, py, r):",
+        "    r2 = r*r",
+    ]
+    for cx, cy, cos_t, sin_t, half_len, half_thick, bound in walls:
+        lines += [
+            "    dx = px - {!r}".format(float(cx)),
+            "    dy = py - {!r}".format(float(cy)),
+            "    if dx*dx + dy*dy < (r + {!r})**2 and point_obb_distance_sq(".format(
+                float(bound)
+            ),
+            "        px, py, {!r}, {!r}, {!r}, {!r}, {!r}, {!r}".format(
+                float(cx), float(cy), float(cos_t), float(sin_t),
+                float(half_len), float(half_thick)
+            ),
+            "    ) < r2:",
+            "        return True",
+        ]
+    lines.append("    return False")
+
+    namespace = {'point_obb_distance_sq': point_obb_distance_sq}
+    exec("\n".join(lines), namespace)
+    # Generated code has no source file, so it cannot use Numba's disk cache
+    return njit(fastmath=True)(namespace['check'])
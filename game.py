@@ -23,92 +23,187 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import os
+import sys
 import time
 import math
 import json
-from copy import deepcopy
+import functools
+from collections import namedtuple
+import numpy as np
 from map import Map
 from game_objects import GameObject, Bullet, Wall, Robot, Zone, Polygon, Circle
 from physics import Vector2D, Vector3D, Orient2D, Pose2D, Velocity2D, Acceleration2D, Movement2D
-from collision_engine_2d import CollisionEngine2D, LineSegment2D, Point2D, Line2D
+from quadtree import QuadTree
+from collision_kernels import build_wall_collision_fn, check_collisions, segments_intersect
+
+MapSpec = namedtuple('MapSpec', [
+    'width', 'height', 'wall_thickness', 'zone_side_length',
+    'per_bullet_demage', 'robot_top_health', 'robot_defence',
+    'zones',   # (x, y, theta, id, type)
+    'walls',   # (x, y, theta, length)
+    'robots',  # (x, y, theta, length, width, robot_id, ammo)
+])
+
+
+def _load_map_config(config_path):
+    """Parse a map config JSON file into a MapSpec.
+
+    Results are cached per absolute path, so resetting a game does not parse
+    the file again. Call ``_parse_map_config.cache_clear()`` to pick up an
+    edited config file. Orientations are already converted to radians.
+
+    Args:
+        config_path (:obj:`str`): The path to the game config JSON file.
+
+    """
+    return _parse_map_config(os.path.abspath(config_path))
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_map_config(config_path):
+    # Load json format map configration
+    with open(config_path, 'r') as f:
+        config = json.load(f)['config']
+
+    return MapSpec(
+        width=config['map_width'],
+        height=config['map_height'],
+        wall_thickness=config['wall_thickness'],
+        zone_side_length=config['zone_side_length'],
+        per_bullet_demage=config['robot_per_bullet_demage'],
+        robot_top_health=config['robot_top_health'],
+        robot_defence=config['robot_defence'],
+        zones=tuple(
+            (
+                zone['coords']['x'], zone['coords']['y'],
+                math.radians(zone['orientation']),
+                zone['id'], zone['type']
+            )
+            for zone in config['zones']
+        ),
+        walls=tuple(
+            (
+                wall['coords']['x'], wall['coords']['y'],
+                math.radians(wall['orientation']),
+                wall['length']
+            )
+            for wall in config['walls']
+        ),
+        robots=tuple(
+            (
+                robot['coords']['x'], robot['coords']['y'],
+                math.radians(robot['orientation']),
+                robot['length'], robot['width'],
+                robot['robot_id'], robot['ammo']
+            )
+            for robot in config['robots']
+        ),
+    )
+
 
 class Game:
     """The game backgound core"""
 
-    def __init__(self, config_path):
+    def __init__(self, config_path, wall_check='sweep'):
         """Game constructor.
 
         Args:
             config_path (:obj:`str`): The path to the game config JSON file.
+            wall_check (:obj:`str`): How robots are checked against walls,
+                'sweep' for one batch over all robots and walls (Cython if
+                built, NumPy otherwise) or 'generated' for a per-robot
+                function specialized to this map's walls.
 
         """
+        if wall_check not in ('sweep', 'generated'):
+            raise ValueError(
+                "Unknown wall check '{:}'.".format(wall_check)
+            )
+        self.wall_check = wall_check
         self.game_objects = []
-
-        # Load json format map configration
-        with open(config_path, 'r') as f:
-            map_config = json.load(f)
+        self._walls = []
+        self._robots = []
+        self._zones = []
+        self._bullets = []
+        self._walls_dirty = False
+        # Robot positions and radii as arrays for the vectorized proximity
+        # check, grown by add_game_object
+        self._robot_xy = np.empty((0, 2), dtype=np.float64)
+        self._robot_r = np.empty(0, dtype=np.float64)
+
+        map_spec = _load_map_config(config_path)
 
         # Load map properties
         self.map = Map(
-            width=map_config['config']['map_width'],
-            height=map_config['config']['map_height'],
-            wall_thickness=map_config['config']['wall_thickness']
+            width=map_spec.width,
+            height=map_spec.height,
+            wall_thickness=map_spec.wall_thickness
+        )
+
+        # Collision broad-phase over the walls, filled by add_game_object
+        self.broadphase = QuadTree(
+            (
+                -self.map.wall_thickness,
+                -self.map.wall_thickness,
+                self.map.width + self.map.wall_thickness,
+                self.map.height + self.map.wall_thickness
+            ),
+            threshold=4,
+            max_depth=6
         )
-        self.per_bullet_demage = map_config['config']['robot_per_bullet_demage']
-        self.robot_top_health = map_config['config']['robot_top_health']
+
+        self.per_bullet_demage = map_spec.per_bullet_demage
+        self.robot_top_health = map_spec.robot_top_health
         # Create zones
-        for zone in map_config['config']['zones']:
+        for x, y, theta, zone_id, zone_type in map_spec.zones:
             self.add_game_object(
                 Zone(
                     Pose2D(
-                        position=Vector2D(
-                            zone['coords']['x'],
-                            zone['coords']['y'],
-                        ),
-                        orientation=Orient2D(math.radians(zone['orientation']))
+                        position=Vector2D(x, y),
+                        orientation=Orient2D(theta)
                     ),
-                    map_config['config']['zone_side_length'],
-                    zone['id'],
-                    zone['type']
+                    map_spec.zone_side_length,
+                    zone_id,
+                    zone_type
                 )
             )
 
         # Create walls
-        for wall in map_config['config']['walls']:
+        for x, y, theta, length in map_spec.walls:
             self.add_game_object(
                 Wall(
                     Pose2D(
-                        position=Vector2D(wall['coords']['x'], wall['coords']['y']),
-                        orientation=Orient2D(math.radians(wall['orientation']))
+                        position=Vector2D(x, y),
+                        orientation=Orient2D(theta)
                     ),
-                    wall['length'],
-                    map_config['config']['wall_thickness']
+                    length,
+                    map_spec.wall_thickness
                 )
             )
 
         # Create robots
-        for robot in map_config['config']['robots']:
+        for x, y, theta, length, width, robot_id, ammo in map_spec.robots:
             self.add_game_object(
                 Robot(
                     Pose2D(
-                        position=Vector2D(
-                            robot['coords']['x'],
-                            robot['coords']['y']
-                        ),
-                        orientation=Orient2D(math.radians(robot['orientation']))
+                        position=Vector2D(x, y),
+                        orientation=Orient2D(theta)
                     ),
-                    robot['length'], robot['width'],
-                    robot['robot_id'],
-                    map_config['config']['robot_top_health'],
-                    robot['ammo'],
-                    map_config['config']['robot_defence']
+                    length, width,
+                    robot_id,
+                    map_spec.robot_top_health,
+                    ammo,
+                    map_spec.robot_defence
                 )
             )
 
+        # Wall arrays for the robot-wall check
+        self._rebuild_wall_arrays()
+
     def fire(self, robot_id):
-        for obj in self.game_objects:
-            if type(obj) is Robot and obj.id==robot_id and obj.ammo > 0:
-                robot = obj
+        for robot in self._robots:
+            if robot.id==robot_id and robot.ammo > 0:
 
                 robot.ammo -= 1
                 self.add_game_object(
@@ -134,214 +229,199 @@ class Game:
                 )
             )
         self.game_objects.append(obj)
+        if type(obj) is Wall:
+            self._walls.append(obj)
+            self.broadphase.insert(obj, obj.aabb())
+            # Wall arrays are rebuilt before the next robot-wall check
+            self._walls_dirty = True
+        elif type(obj) is Robot:
+            self._robots.append(obj)
+            self._robot_xy = np.empty((len(self._robots), 2), dtype=np.float64)
+            self._robot_r = np.append(self._robot_r, obj.radius)
+        elif type(obj) is Zone:
+            self._zones.append(obj)
+        elif type(obj) is Bullet:
+            self._bullets.append(obj)
+
+    def _rebuild_wall_arrays(self):
+        """Pack the wall boxes for the robot-wall checks."""
+        self._walls_packed = np.ascontiguousarray(np.array(
+            [wall.obb for wall in self._walls], dtype=np.float64
+        ).reshape(-1, 6))
+        self._wall_cx = self._walls_packed[:, 0]
+        self._wall_cy = self._walls_packed[:, 1]
+        self._wall_cos = self._walls_packed[:, 2]
+        self._wall_sin = self._walls_packed[:, 3]
+        self._wall_hl = self._walls_packed[:, 4]
+        self._wall_ht = self._walls_packed[:, 5]
+
+        # Robot-wall test specialized for these walls, only built if selected
+        self._wall_collision_fn = None
+        if self.wall_check == 'generated':
+            self._wall_collision_fn = build_wall_collision_fn(tuple(
+                wall.obb + (wall.bound_radius,) for wall in self._walls
+            ))
+        self._walls_dirty = False
 
 
     def update(self, t_interval):
         """The game update logic."""
-        # Update game objects
-        game_obj_index = 0
-        remove_indexs = []
-        for game_obj in self.game_objects:
-            old_pose = deepcopy(game_obj.pose)
-            game_obj.update(t_interval)
-
-            if type(game_obj) is Robot:
-                # Collision check
-                collision = False
-
-                for another_obj in self.game_objects:
-                    if type(another_obj) is Robot and \
-                    game_obj is not another_obj and \
-                    game_obj.pose.position.find_distance(
-                        another_obj.pose.position
-                    ) < game_obj.radius + another_obj.radius:
-                        # Collision with other robots
-                        # game_obj.moveTo(old_pose)
+        if self._walls_dirty:
+            self._rebuild_wall_arrays()
+
+        # Move robots, then resolve their collisions as one batch
+        robots = self._robots
+        old_poses = []
+        for i, robot in enumerate(robots):
+            old_poses.append(robot.pose.clone())
+            robot.update(t_interval)
+            self._robot_xy[i, 0] = robot.pose.position.x
+            self._robot_xy[i, 1] = robot.pose.position.y
+
+        # Robot-robot proximity check for all pairs at once
+        xy = self._robot_xy
+        r = self._robot_r
+        diff = xy[:, None, :] - xy[None, :, :]
+        d2 = (diff*diff).sum(-1)
+        thr = (r[:, None] + r[None, :])**2
+        colliding_pairs = np.argwhere(np.triu(d2 < thr, k=1))
+        collisions = np.zeros(len(robots), dtype=bool)
+        collisions[colliding_pairs[:, 0]] = True
+        collisions[colliding_pairs[:, 1]] = True
+
+        # Robot-wall check
+        if self._wall_collision_fn is not None:
+            for i in range(len(robots)):
+                if not collisions[i] and \
+                self._wall_collision_fn(float(xy[i, 0]), float(xy[i, 1]), float(r[i])):
+                    collisions[i] = True
+        elif check_collisions is not None:
+            # Every robot against every wall box at once
+            collisions |= check_collisions(xy, r, self._walls_packed).astype(bool)
+        else:
+            # Same sweep in NumPy when the Cython kernel is not built
+            dx = xy[:, 0, None] - self._wall_cx[None, :]
+            dy = xy[:, 1, None] - self._wall_cy[None, :]
+            lx = self._wall_cos*dx + self._wall_sin*dy
+            ly = -self._wall_sin*dx + self._wall_cos*dy
+            cx = np.clip(lx, -self._wall_hl, self._wall_hl)
+            cy = np.clip(ly, -self._wall_ht, self._wall_ht)
+            wall_d2 = (lx - cx)**2 + (ly - cy)**2
+            hit = wall_d2 < (r**2)[:, None]
+            collisions |= hit.any(axis=1)
+
+        for i, robot in enumerate(robots):
+            if collisions[i]:
+                robot.moveTo(old_poses[i])
+
+        # Zones
+        for zone in self._zones:
+            zone.update(t_interval)
+            # find friend robot
+            for robot in self._robots:
+                if zone.type == 'defence':
+                    zone.handle_as_defence_zone(robot, t_interval)
+                elif zone.type == 'supply':
+                    zone.handle_as_supply_zone(robot, t_interval)
+
+        # Bullets
+        red_defence = 0
+        blue_defence = 0
+        for obj in self._robots:
+            if obj.cancelled_damage != 0:
+                if obj.id[0] == 'R':
+                    red_defence = obj.cancelled_damage
+                elif obj.id[0] == 'B':
+                    blue_defence = obj.cancelled_damage
+
+        spent_bullets = []
+        for bullet in self._bullets:
+            bullet.update(t_interval)
+
+            # Bullet collision check
+            collision = False
+
+            x0 = bullet.last_pose.position.x
+            y0 = bullet.last_pose.position.y
+            x1 = bullet.pose.position.x
+            y1 = bullet.pose.position.y
+            step = math.hypot(x1 - x0, y1 - y0)
+
+            # Walls first, then robots, as in the original game_objects order
+            for wall in self.broadphase.query(
+                (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+            ):
+                dx = x1 - wall.obb[0]
+                dy = y1 - wall.obb[1]
+                reach = step + wall.bound_radius
+                if dx*dx + dy*dy >= reach * reach:
+                    # The bullet step cannot reach this wall
+                    continue
+
+                for edge in wall.edges:
+                    if segments_intersect(x0, y0, x1, y1, *edge):
+                        # Collision with a wall edge
+                        print("Shot wall")
                         collision = True
                         break
 
-
-
-                    if type(another_obj) is Wall:
-                        vertex = deepcopy(another_obj.shape_set[0].vertex)
-                        coords = []
-                        for v in vertex:
-                            if collision:
-                                break
-                            new_v = v.rotate(
-                                another_obj.pose.orientation.z
-                            )
-                            new_v += another_obj.pose.position
-
-                            if new_v.find_distance(
-                                game_obj.pose.position
-                            ) < game_obj.radius:
-                                # Collision with a wall corner
-                                collision = True
-                                break
-
-                            coords.append(new_v)
-
-                        edges = []
-                        for i in range(len(coords)):
-                            if collision:
-                                break
-                            new_line = LineSegment2D(
-                                Point2D(coords[i].x, coords[i].y),
-                                Point2D(coords[(i+1)%len(coords)].x, coords[(i+1)%len(coords)].y)
-                            )
-                            edges.append(new_line)
-
-                        for edge in edges:
-                            if collision:
-                                break
-                            perpendicular_line = edge.find_perpendicular(through_point=Point2D(
-                                game_obj.pose.position.x,
-                                game_obj.pose.position.y
-                            ))
-
-                            intersetion = perpendicular_line.find_intersection(edge)
-
-                            if intersetion!=False:
-                                xmax = max(edge.point1.x, edge.point2.x)
-                                xmin = min(edge.point1.x, edge.point2.x)
-                                ymax = max(edge.point1.y, edge.point2.y)
-                                ymin = min(edge.point1.y, edge.point2.y)
-
-                                if (intersetion.x <= xmax or \
-                                math.isclose(intersetion.x, xmax, rel_tol=1e-4)) \
-                                and (intersetion.x >= xmin or \
-                                math.isclose(intersetion.x, xmin, rel_tol=1e-4)) \
-                                and (intersetion.y <= ymax or \
-                                math.isclose(intersetion.y, ymax, rel_tol=1e-4)) \
-                                and (intersetion.y >= ymin or \
-                                math.isclose(intersetion.y, ymin, rel_tol=1e-4)) :
-
-                                    if edge.find_distance(
-                                        Point2D(
-                                            game_obj.pose.position.x,
-                                            game_obj.pose.position.y
-                                        )
-                                    ) < game_obj.radius:
-
-                                        # Collision with a wall edge
-                                        collision = True
-                                        break
-
                 if collision:
-                    game_obj.moveTo(old_pose)
-
-
-            elif type(game_obj) is Bullet:
-                # Bullet collision check
-                collision = False
-
-                red_defence = 0
-                blue_defence = 0
-                for obj in self.game_objects:
-                    if type(obj) is Robot:
-                        if obj.cancelled_damage != 0:
-                            if obj.id[0] == 'R':
-                                red_defence = obj.cancelled_damage
-                            elif obj.id[0] == 'B':
-                                blue_defence = obj.cancelled_damage
-                
-                for another_obj in self.game_objects:
-                    if type(another_obj) is Robot and \
-                    game_obj.pose.position.find_distance(
-                        another_obj.pose.position
-                    ) < another_obj.radius:
-                        # Shot a robot
-                        # Robot health deduction TODO
-                        cancelled_damage = 0
-                        if another_obj.id[0] == 'R':
-                            cancelled_damage = red_defence
-                        elif another_obj.id[0] == 'B':
-                            cancelled_damage = blue_defence
-
-                        print("Shot robot, damage: {}".format(self.per_bullet_demage - cancelled_damage))
-                        another_obj.health -= (self.per_bullet_demage - cancelled_damage)
-                        another_obj.health = max(another_obj.health, 0)  # Make not negtive health
-                        collision = True
-                        break
-
+                    # Stop scanning, the bullet is spent
+                    break
 
-                    if type(another_obj) is Wall:
-                        vertex = deepcopy(another_obj.shape_set[0].vertex)
-                        coords = []
-                        for v in vertex:
-                            if collision:
-                                break
-                            new_v = v.rotate(
-                                another_obj.pose.orientation.z
-                            )
-                            new_v += another_obj.pose.position
-                            coords.append(new_v)
-
-                        edges = []
-                        for i in range(len(coords)):
-                            if collision:
-                                break
-                            new_line = LineSegment2D(
-                                Point2D(coords[i].x, coords[i].y),
-                                Point2D(coords[(i+1)%len(coords)].x, coords[(i+1)%len(coords)].y)
-                            )
-                            edges.append(new_line)
-
-                        for edge in edges:
-                            if collision:
-                                break
-                        
-                            if CollisionEngine2D.point_line_collision(
-                                point=Point2D(
-                                    game_obj.last_pose.position.x,
-                                    game_obj.last_pose.position.y
-                                ),
-                                point_movement=Point2D(
-                                    round((game_obj.pose-game_obj.last_pose).position.x),
-                                    round((game_obj.pose-game_obj.last_pose).position.y)
-                                ),
-                                line_segment=edge,
-                                line_segment_movement=Point2D(0, 0)
-                            ):
-
-                                # Collision with a wall edge
-                                print("Shot wall")
-                                collision = True
-                                break
-
-                        # exit()
-                
+            for another_obj in self._robots:
                 if collision:
-                    remove_indexs.append(game_obj_index)
-            elif type(game_obj) is Zone:
-                zone = game_obj
-                # find friend robot
-                for another_obj in self.game_objects:
-                    if type(another_obj) is Robot:
+                    break
+                if (x1 - another_obj.pose.position.x)**2 + \
+                (y1 - another_obj.pose.position.y)**2 < another_obj.radius_sq:
+                    # Shot a robot
+                    # Robot health deduction TODO
+                    cancelled_damage = 0
+                    if another_obj.id[0] == 'R':
+                        cancelled_damage = red_defence
+                    elif another_obj.id[0] == 'B':
+                        cancelled_damage = blue_defence
 
-                        if zone.type == 'defence':
-                            zone.handle_as_defence_zone(another_obj, t_interval)
-                        elif zone.type == 'supply':
-                            zone.handle_as_supply_zone(another_obj, t_interval)
-                    
+                    print("Shot robot, damage: {}".format(self.per_bullet_demage - cancelled_damage))
+                    another_obj.health -= (self.per_bullet_demage - cancelled_damage)
+                    another_obj.health = max(another_obj.health, 0)  # Make not negtive health
+                    collision = True
+                    break
 
+            if collision:
+                spent_bullets.append(bullet)
 
+        for bullet in spent_bullets:
+            self._bullets.remove(bullet)
+            self.game_objects.remove(bullet)
 
-            game_obj_index += 1
 
-        for i in range(len(remove_indexs)-1, -1, -1):
-            self.game_objects.pop(remove_indexs[i])
 
+    def run(self, update_time_interval=1, headless=False, ticks=None, log_every=0):
+        """Run the game loop.
 
+        Args:
+            update_time_interval (:obj:`int or float`): Simulated seconds per tick.
+            headless (:obj:`bool`): Tick as fast as possible instead of
+                keeping pace with the wall clock.
+            ticks (:obj:`int`): Number of ticks to run, forever if None.
+            log_every (:obj:`int`): Print the tick count and simulated time
+                every this many ticks, 0 disables it.
 
-    def run(self):
-        update_time_interval = 1#0.01
-        while True:
+        """
+        tick = 0
+        next_tick = time.monotonic()
+        while ticks is None or tick < ticks:
             self.update(update_time_interval)
-            time.sleep(update_time_interval)
-            # print('game is running')
-            print()
+            tick += 1
+            if log_every and tick % log_every == 0:
+                sys.stdout.write("tick={:} sim_t={:.2f}\n".format(
+                    tick, tick * update_time_interval
+                ))
+            if not headless:
+                # Sleep until the next deadline so the delay does not drift
+                next_tick += update_time_interval
+                time.sleep(max(0, next_tick - time.monotonic()))
 
 
 if __name__ == '__main__':
@@ -24,7 +24,6 @@
 # SOFTWARE.
 
 import math
-from copy import deepcopy
 from physics import dynamic_update, Movement2D, Vector2D, Orient2D, Pose2D, Velocity2D, Acceleration2D
 import time
 
@@ -90,6 +89,24 @@ class GameObject:
         offset = destination - self.pose
         self.move(offset)
 
+    def aabb(self):
+        """Axis-aligned bounding box of the object's shapes in world frame.
+
+        Returns:
+            :obj:`tuple`: Bounding box as (xmin, ymin, xmax, ymax).
+
+        """
+        xs = [self.pose.position.x]
+        ys = [self.pose.position.y]
+        for shape in self.shape_set:
+            if isinstance(shape, Polygon):
+                for v in shape.vertex:
+                    new_v = v.rotate(self.pose.orientation.z)
+                    new_v += self.pose.position
+                    xs.append(new_v.x)
+                    ys.append(new_v.y)
+        return min(xs), min(ys), max(xs), max(ys)
+
     def __str__(self):
         return "Game object:\n\tpose: {:}\n\tvel: {:}\n\tacclr: {:}".format(
             self.pose, self.velocity, self.acceleration
@@ -123,6 +140,49 @@ class Wall(GameObject):
             )
         ]
         GameObject.__init__(self, pose, velocity, acceleration, shape_set)
+        self.length = length
+        self.width = width
+
+        # Walls never move, so everything derived from the pose is computed
+        # once here instead of on every collision check
+        theta = pose.orientation.z
+        self._cos = math.cos(theta)
+        self._sin = math.sin(theta)
+        self._world_vertices = tuple(
+            Vector2D(
+                self._cos*v.x - self._sin*v.y + pose.position.x,
+                self._sin*v.x + self._cos*v.y + pose.position.y
+            )
+            for v in shape_set[0].vertex
+        )
+        # Edges as (x1, y1, x2, y2) float tuples for the collision kernels
+        self.edges = tuple(
+            (
+                float(v1.x), float(v1.y),
+                float(v2.x), float(v2.y)
+            )
+            for v1, v2 in zip(
+                self._world_vertices,
+                self._world_vertices[1:] + self._world_vertices[:1]
+            )
+        )
+
+        # Oriented box as (cx, cy, cos, sin, half length, half thickness),
+        # the pose is at a corner of the wall
+        half_len = length / 2
+        half_thick = width / 2
+        self.obb = (
+            pose.position.x + self._cos*half_len + self._sin*half_thick,
+            pose.position.y + self._sin*half_len - self._cos*half_thick,
+            self._cos, self._sin, half_len, half_thick
+        )
+        # Radius of a circle around the box center, for a cheap reject
+        # before the exact tests
+        self.bound_radius = 0.5 * math.sqrt(length**2 + width**2)
+
+    def world_vertices(self):
+        """The wall corners in world frame, precomputed at construction."""
+        return self._world_vertices
 
 
 class Zone(GameObject):
@@ -248,7 +308,7 @@ class Bullet(GameObject):
         self.team = team
 
     def update(self, t_interval):
-        self.last_pose = deepcopy(self.pose)
+        self.last_pose = self.pose.clone()
         GameObject.update(self, t_interval)
 
 
@@ -321,4 +381,9 @@ class Robot(GameObject):
 
     @property
     def radius(self):
-        return math.sqrt((self.length/2)**2 + (self.width/2)**2)
+        return math.sqrt(self.radius_sq)
+
+    @property
+    def radius_sq(self):
+        """Squared collision radius, for distance tests without a sqrt."""
+        return (self.length/2)**2 + (self.width/2)**2
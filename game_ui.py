@@ -155,14 +155,9 @@ class GameUI:
             color = '#888'
 
             if type(obj) is Wall:
-                vertex = deepcopy(obj.shape_set[0].vertex)
                 coords = []
-                for v in vertex:
-                    new_v = v.rotate(
-                        obj.pose.orientation.z
-                    )
-                    new_v += obj.pose.position
-                    new_v = self.real_coord_2_display_coord(new_v)
+                for v in obj.world_vertices():
+                    new_v = self.real_coord_2_display_coord(v)
                     coords.append(new_v.x)
                     coords.append(new_v.y)
                 self.canvas.create_polygon(coords, fill=color, outline=color)
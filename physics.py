@@ -43,6 +43,8 @@ def dynamic_update(current_v, t_interval, acceleration):
 
 class Vector3D:
     """Vector representation in 3-dimensional space."""
+    __slots__ = ('x', 'y', 'z')
+
     def __init__(self, x, y, z):
         self.x = x
         self.y = y
@@ -73,6 +75,8 @@ class Vector3D:
 
 class Vector2D(Vector3D):
     """Vector representation in 2-dimensional space."""
+    __slots__ = ()
+
     def __init__(self, x, y):
         Vector3D.__init__(self, x, y, None)
 
@@ -111,6 +115,9 @@ class Vector2D(Vector3D):
     def __str__(self):
         return "Vector2D({:}, {:})".format(self.x, self.y)
 
+    def clone(self):
+        return Vector2D(self.x, self.y)
+
     def rotate(self, theta, center=None):
         """
         theta: in radian
@@ -137,6 +144,8 @@ class Vector2D(Vector3D):
 
 class Orient2D(Vector3D):
     """Orientation representation in 3-dimensional space."""
+    __slots__ = ()
+
     def __init__(self, z):
         Vector3D.__init__(self, None, None, z)
 
@@ -171,9 +180,13 @@ class Orient2D(Vector3D):
     def __str__(self):
         return "{:} radians".format(self.z)
 
+    def clone(self):
+        return Orient2D(self.z)
+
 
 class GeoUnit2D:
     """The unit representation in 2-dimension space."""
+    __slots__ = ('transfer', 'rotation')
 
     def __init__(self, transfer, rotation):
         """Geomatric Unit in 2D spcae constructor.
@@ -226,6 +239,8 @@ class GeoUnit2D:
 
 class Velocity2D(GeoUnit2D):
     """The velocity representaion in 2-dimensional space."""
+    __slots__ = ('linear', 'angular')
+
     def __init__(self, linear, angular):
         """Velocity representation in 2D spcae constructor.
 
@@ -241,6 +256,8 @@ class Velocity2D(GeoUnit2D):
 
 class Acceleration2D(GeoUnit2D):
     """The acceleration representaion in 2-dimensional space."""
+    __slots__ = ('linear', 'angular')
+
     def __init__(self, linear, angular):
         """Velocity representation in 2D spcae constructor.
 
@@ -256,6 +273,8 @@ class Acceleration2D(GeoUnit2D):
 
 class Movement2D(GeoUnit2D):
     """The movement representaion in 2-dimensional space."""
+    __slots__ = ('linear', 'angular')
+
     def __init__(self, linear, angular):
         """Movement representation in 2D spcae constructor.
 
@@ -271,6 +290,8 @@ class Movement2D(GeoUnit2D):
 
 class Pose2D(GeoUnit2D):
     """The pose representaion in 2-dimensional space."""
+    __slots__ = ('position', 'orientation')
+
     def __init__(self, position, orientation):
         """Pose in 2D spcae constructor.
 
@@ -282,3 +303,7 @@ class Pose2D(GeoUnit2D):
         GeoUnit2D.__init__(self, position, orientation)
         self.position = self.transfer
         self.orientation = self.rotation
+
+    def clone(self):
+        """A cheap copy of the pose, avoiding deepcopy on the hot path."""
+        return Pose2D(self.position.clone(), self.orientation.clone())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# MIT License
+#
+# Copyright (c) 2018 Chenrui Lei
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+def aabb_overlap(a, b):
+    """Check whether two axis-aligned bounding boxes overlap.
+
+    Args:
+        a (:obj:`tuple`): Bounding box as (xmin, ymin, xmax, ymax).
+        b (:obj:`tuple`): Bounding box as (xmin, ymin, xmax, ymax).
+
+    """
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+class QuadTree:
+    """Point-region quadtree storing objects by their bounding boxes."""
+
+    def __init__(self, aabb, threshold=4, max_depth=6, depth=0):
+        """Quadtree node constructor.
+
+        Args:
+            aabb (:obj:`tuple`): Region covered by this node as
+                (xmin, ymin, xmax, ymax).
+            threshold (:obj:`int`): Number of items a leaf holds before it is
+                split into four children.
+            max_depth (:obj:`int`): Depth at which leaves are never split.
+            depth (:obj:`int`): Depth of this node, 0 for the root.
+
+        """
+        self.aabb = aabb
+        self.threshold = threshold
+        self.max_depth = max_depth
+        self.depth = depth
+        self.items = []
+        self.children = None
+
+    def insert(self, item, aabb):
+        """Insert an item into every leaf its bounding box overlaps."""
+        if self.children is not None:
+            placed = False
+            for child in self.children:
+                if aabb_overlap(child.aabb, aabb):
+                    child.insert(item, aabb)
+                    placed = True
+            if not placed:
+                # Out of the covered region, keep it here so it is not lost
+                self.items.append((item, aabb))
+            return
+
+        self.items.append((item, aabb))
+        if len(self.items) > self.threshold and self.depth < self.max_depth:
+            self._split()
+
+    def _split(self):
+        xmin, ymin, xmax, ymax = self.aabb
+        xmid = (xmin + xmax) / 2
+        ymid = (ymin + ymax) / 2
+        self.children = [
+            QuadTree(quad, self.threshold, self.max_depth, self.depth + 1)
+            for quad in (
+                (xmin, ymin, xmid, ymid),
+                (xmid, ymin, xmax, ymid),
+                (xmin, ymid, xmid, ymax),
+                (xmid, ymid, xmax, ymax),
+            )
+        ]
+        items = self.items
+        self.items = []
+        for item, aabb in items:
+            self.insert(item, aabb)
+
+    def query(self, aabb):
+        """Find the items whose bounding boxes may overlap the given one.
+
+        Args:
+            aabb (:obj:`tuple`): Query region as (xmin, ymin, xmax, ymax).
+
+        Returns:
+            :obj:`list`: Candidate items, each reported once.
+
+        """
+        found = {}
+        self._collect(aabb, found)
+        return list(found.values())
+
+    def _collect(self, aabb, found):
+        for item, item_aabb in self.items:
+            if aabb_overlap(item_aabb, aabb):
+                found[id(item)] = item
+        if self.children is not None:
+            for child in self.children:
+                if aabb_overlap(child.aabb, aabb):
+                    child._collect(aabb, found)
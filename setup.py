@@ -0,0 +1,20 @@
+# Builds the optional Cython robot-wall kernel next to the sources:
+#
+#     python setup.py build_ext --inplace
+#
+# Without it, Game falls back to its NumPy sweep.
+
+from setuptools import Extension, setup
+from Cython.Build import cythonize
+
+setup(
+    name='collision_ext',
+    ext_modules=cythonize(
+        Extension(
+            'collision_ext',
+            sources=['collision_ext.pyx'],
+            extra_compile_args=['-O3', '-ffast-math'],
+        ),
+        language_level=3,
+    ),
+)